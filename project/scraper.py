@@ -1,17 +1,31 @@
 import urllib.request
 import urllib.parse
 import json
+import functools
+import hashlib
+import orjson
 import re
 import networkx as nx
-import numpy as np
 import matplotlib.pyplot as plt
 from tqdm.asyncio import tqdm
-import aiohttp  # requires cchardet package
+import aiohttp  # requires cchardet package; with Brotli installed, responses are fetched br-compressed (smaller + cheaper to decompress than gzip)
 import asyncio
 import os
 import errno
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
 from collections import ChainMap, Counter
 
+# uvloop dispatches event-loop callbacks in libuv's C code instead of Python;
+# with tens of thousands of request/response lifecycles per run that overhead
+# adds up. Only takes effect for loops created after import, so notebooks
+# already running under Jupyter's loop are unaffected.
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
+
 
 ## Util functions ##
 
@@ -27,6 +41,10 @@ def flatten(l):
 
 # Category pages
 
+# The query builders are pure functions of their arguments; lru_cache makes
+# retries and repeat runs skip the urllib quoting + string assembly.
+
+@functools.lru_cache(maxsize=4096)
 def get_category_pages_query(title, namespace_id=0):
     baseurl = "https://en.wikipedia.org/w/api.php?"
     action = "action=query"
@@ -54,6 +72,7 @@ def handle_category_pages_return(wikitext_json):
 
 # Title search
 
+@functools.lru_cache(maxsize=4096)
 def get_wiki_pages_with_prefix_query(prefix, namespace_id=0):
     baseurl = "https://en.wikipedia.org/w/api.php?"
     action = "action=query"
@@ -88,6 +107,11 @@ def get_wiki_data_query(titles):
     else:
         titlestring = titles
 
+    return _build_wiki_data_query(titlestring)
+
+@functools.lru_cache(maxsize=4096)
+def _build_wiki_data_query(titlestring):
+    # Cached on the joined title string since lists are unhashable
     baseurl = "https://en.wikipedia.org/w/api.php?"
     action = "action=query"
     content = "prop=revisions&rvprop=content&rvslots=*"
@@ -107,6 +131,7 @@ def handle_wiki_data_return(wikitext_json):
 
 # Wiki page revisions
 
+@functools.lru_cache(maxsize=4096)
 def get_wiki_page_revisions_query(title):
 
     baseurl = "https://en.wikipedia.org/w/api.php?"
@@ -159,6 +184,15 @@ def handle_user_edits_return(wikitext_json):
 
 # HTTP Request handling
 
+# On-disk cache of raw API responses keyed by query URL. During iterative
+# development the same categories get re-fetched over and over; with
+# use_cache enabled a second run skips the network entirely. Delete the
+# directory to force fresh data.
+_QUERY_CACHE_DIR = "./.query_cache"
+
+def _query_cache_path(query):
+    return os.path.join(_QUERY_CACHE_DIR, hashlib.md5(query.encode()).hexdigest() + ".json")
+
 def send_urlib_request_sync(query):
     wikiresponse = urllib.request.urlopen(query)
     wikidata = wikiresponse.read()
@@ -167,7 +201,7 @@ def send_urlib_request_sync(query):
 
     return wikitext_json
 
-async def send_urlib_request_async(query_info, response_handler):
+async def send_urlib_request_async(query_info, response_handler, session, use_cache=False):
     # response_handler callback functions should return a continue indicator as first argument, which will trigger another query if it is not None, and the actual return as a second argument.
     # Will return a list of results if query_continue_param is provided, otherwise just the response.
 
@@ -185,79 +219,107 @@ async def send_urlib_request_async(query_info, response_handler):
         else:
             curr_query = query
 
-        async with aiohttp.ClientSession(timeout=aiohttp. ClientTimeout(total=30)) as session:
-            async with session.get(curr_query) as response:
-                try:
-                    html = await response.text()
+        wikitext_json = None
 
-                    wikitext_json = json.loads(html)
+        cache_path = _query_cache_path(curr_query) if use_cache else None
+        if cache_path is not None and os.path.exists(cache_path):
+            with open(cache_path, "rb") as file:
+                wikitext_json = orjson.loads(file.read())
 
-                    curr_results, contin = response_handler(wikitext_json)
-
-                    if request_count == 1:
-                        results = curr_results
-                    else:
-                        if type(curr_results) is list:
-                            results.extend(curr_results)
-                        elif type(curr_results) is dict:
-                            results |= (curr_results)
+        # Retry transient failures with exponential backoff instead of
+        # silently dropping the page like the old bare except did.
+        for attempt in range(5 if wikitext_json is None else 0):
+            try:
+                async with session.get(curr_query) as response:
+                    if response.status == 429:
+                        # Rate limited: back off for as long as the API asks
+                        # before retrying instead of hammering it further
+                        try:
+                            retry_after = float(response.headers.get("Retry-After", 1))
+                        except ValueError:
+                            # Retry-After may also be an HTTP-date; fall back
+                            # to the usual exponential backoff
+                            retry_after = 0.5 * 2 ** attempt
+                        if attempt < 4:
+                            await asyncio.sleep(retry_after)
                         else:
-                            print("Can't handle type " + str(type(curr_results)))
-                except:
-                    error = 0 # stub
+                            print("Giving up on query after 5 attempts (rate limited): " + curr_query)
+                        continue
 
-    # Option to turn unnamed list into dict in case of undistinguishable information, configure in query generator
-    if query_info["name"] is not None:
-        results = {query_info["name"]: results}
+                    raw = await response.read()
 
-    return results
-
-async def urlib_request_worker(queue, session, results_p, pbar, response_handler):
-    # Worker for processing multiple queries
-    while True:
-        query_info = await queue.get()
-        results_p.append(await send_urlib_request_async(query_info, response_handler))
-        pbar.update(1)
-        queue.task_done()
+                wikitext_json = orjson.loads(raw)  # orjson accepts bytes directly, skips the utf-8 decode into a str
 
-async def handle_queries(queries, response_handler, tqdm_desc=None):
+                if cache_path is not None:
+                    os.makedirs(_QUERY_CACHE_DIR, exist_ok=True)
+                    with open(cache_path, "wb") as file:
+                        file.write(raw)
+                break
+            except (aiohttp.ClientError, asyncio.TimeoutError, orjson.JSONDecodeError) as exc:
+                if attempt < 4:
+                    await asyncio.sleep(0.5 * 2 ** attempt)
+                else:
+                    print("Giving up on query after 5 attempts: " + curr_query + " (" + repr(exc) + ")")
 
-    N_MAX_WORKERS = 200
+        if wikitext_json is None:
+            break # permanent failure, return what we have so far
 
-    if len(queries) <= N_MAX_WORKERS:
-        coroutines = [send_urlib_request_async(query_info, response_handler) for query_info in queries]
-        wikitexts = await tqdm.gather(*coroutines, desc=tqdm_desc)
+        try:
+            curr_results, contin = response_handler(wikitext_json)
+        except (KeyError, StopIteration):
+            # API error payload without the expected query structure
+            print("Unexpected API response for query: " + curr_query)
+            break
+
+        if request_count == 1:
+            results = curr_results
+        else:
+            if type(curr_results) is list:
+                results.extend(curr_results)
+            elif type(curr_results) is dict:
+                results |= (curr_results)
+            else:
+                print("Can't handle type " + str(type(curr_results)))
 
-        return wikitexts
-    else:
-        N_WORKERS = 50
-        queue = asyncio.Queue()
-        results_p = []
+    # Option to turn unnamed list into dict in case of undistinguishable information, configure in query generator
+    if query_info["name"] is not None:
+        results = {query_info["name"]: results}
 
-        async def async_query_generator():
-            for i in queries:
-                yield i
+    return results
 
-        async with aiohttp.ClientSession() as session:
+async def handle_queries(queries, response_handler, tqdm_desc=None, use_cache=False):
 
-            pbar = tqdm(total=len(queries), desc=tqdm_desc, mininterval=0.2)
+    N_CONCURRENT_REQUESTS = 50
 
-            workers = [asyncio.create_task(urlib_request_worker(queue, session, results_p, pbar, response_handler)) for _ in range(N_WORKERS)]
-            
-            async for query_info in async_query_generator():
-                await queue.put(query_info)
-            
-            # Wait for tasks to finish
-            await queue.join()
+    # One session for the whole run: all queries go to en.wikipedia.org, so
+    # keep-alive lets every request reuse the same TLS connection pool
+    # instead of paying a handshake per query. The semaphore keeps at most
+    # N_CONCURRENT_REQUESTS in flight so launching thousands of queries at
+    # once does not open thousands of sockets and trip the API rate limit
+    # (this replaces the old separate worker-queue branch).
+    sem = asyncio.Semaphore(N_CONCURRENT_REQUESTS)
 
-        # Finished
-        for worker in workers:
-            worker.cancel()
+    async def bounded_request(query_info):
+        async with sem:
+            return await send_urlib_request_async(query_info, response_handler, session, use_cache=use_cache)
 
-        return results_p
+    connector = aiohttp.TCPConnector(limit_per_host=N_CONCURRENT_REQUESTS, ttl_dns_cache=300)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=30)) as session:
+        return await tqdm.gather(*(bounded_request(query_info) for query_info in queries), desc=tqdm_desc)
 
 # Parser
 
+# Compiled once at import: these run on every page, and per-call pattern
+# lookup in the re module cache adds up over ~10k pages.
+# \n\t are excluded from the link capture so no whitespace-normalization
+# pass over the page body is needed before matching.
+_USER_LINK_RE = re.compile(r'\[(User:[^/\]\[\|\n\t]+)[\]\|]') # Previous: '\[([^\]\[\|:]+)[\]\|]'
+_ARTICLE_LINK_RE = re.compile(r'\[([^/\]\[\|\n\t]+)[\]\|]') # Previous: '\[([^\]\[\|:]+)[\]\|]'
+# Links into other namespaces can never become article-article edges, so
+# they are dropped right after extraction instead of being deduplicated,
+# shipped back from the worker process and checked against the graph.
+_NON_ARTICLE_LINK_RE = re.compile(r'(?:File|Image|Media|Category|Template|Wikipedia|User|User talk|Talk|Help|Portal|Special|Draft):')
+
 def parse_talk_page(page):
 
     # Does page exist?
@@ -265,25 +327,13 @@ def parse_talk_page(page):
         content = page["revisions"][0]["slots"]["main"]["*"]  # * from rvslots
         title = page["title"]
 
-        # Normalize whitespace
-        content = re.sub(r'[\n\t\ ]+', ' ', content)
-
         # Retreive links to User: pages
-        links = re.findall('\[(User:[^/\]\[\|]+)[\]\|]', content) # Previous: '\[([^\]\[\|:]+)[\]\|]'
-        filtered_links = np.unique(links)
+        links = _USER_LINK_RE.findall(content)
+        filtered_links = list(dict.fromkeys(links)) # dedup in O(n), keeps order
 
-        origin_title_list = re.findall('([^/]+).*', title)
-        if len(origin_title_list) > 0:
-            origin_title = origin_title_list[0]
-        else:
-            origin_title = title
-        
-        # Article word count
-        #word_count = len(re.findall('\w+', content.lower()))
-        #graph.nodes(data=True)[title]["word_count"] = word_count
-
-        # Obsolete Heuristic for Archive pages
-        #archive_number = re.findall('\|\s*counter\s*=\s*([^\|\}\s]+)', content)
+        # Titles have the fixed shape 'Talk:Page[/Archive N]', so a partition
+        # on the first '/' replaces the old regex findall
+        origin_title = title.partition('/')[0]
 
         return {"origin_title": origin_title, "user_links": filtered_links}
     else:
@@ -297,18 +347,30 @@ def parse_article_page(page):
         content = page["revisions"][0]["slots"]["main"]["*"]  # * from rvslots
         title = page["title"]
 
-        # Normalize whitespace
-        content = re.sub(r'[\n\t\ ]+', ' ', content)
-
         # Retreive links to other articles
-        links = re.findall('\[([^/\]\[\|]+)[\]\|]', content) # Previous: '\[([^\]\[\|:]+)[\]\|]'
-        filtered_links = np.unique(links)
+        links = _ARTICLE_LINK_RE.findall(content)
+        filtered_links = [link for link in dict.fromkeys(links) if not _NON_ARTICLE_LINK_RE.match(link)] # dedup in O(n), keeps order
 
         return {"origin_title": title, "article_links": filtered_links}
     else:
         return None
 
 
+# Batch helpers for parsing in worker processes. The regex + dedup work is
+# CPU-bound, so batches are farmed out to a ProcessPoolExecutor; these must
+# live at module level to be picklable.
+
+def _parse_talk_batch(pages):
+    if not isinstance(pages, dict):
+        return []
+    return [parse_talk_page(page_content) for page_content in pages.values()]
+
+def _parse_article_batch(pages):
+    if not isinstance(pages, dict):
+        return []
+    return [parse_article_page(page_content) for page_content in pages.values()]
+
+
 def parse_page_revisions(revision_list):
 
     #reverts = {k: [edit for edit in v if "comment" in edit and "revert" in edit["comment"].lower()] for k, v in infos["revision_dict"].items()}
@@ -327,19 +389,11 @@ def save_page(page):
 
         filename = "./page_contents/" + title +".txt"
 
-         # create directories if they do not exist
-        if not os.path.exists(os.path.dirname(filename)):
-            try:
-                os.makedirs(os.path.dirname(filename))
-            except OSError as exc: # Guard against race condition
-                if exc.errno != errno.EEXIST:
-                    raise
-
-        with open(filename, "+w") as file:
-            file.write(content)
+        write_file_to_folder(filename, content)
 
 # Getting plaintext wiki article pages
 
+@functools.lru_cache(maxsize=4096)
 def get_plaintext_wiki_data_query(title):
     baseurl = "https://en.wikipedia.org/w/api.php?"
     action = "action=query"
@@ -358,6 +412,11 @@ def get_plaintext_wiki_data_query(title):
 # Save pages to disk
 def write_file_to_folder(filepath, content):
     # filepath = filepath.replace("/", '-')
+    # Encode once and write in binary mode instead of letting text mode
+    # re-encode chunk by chunk
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+
     # create directories if they do not exist
     if not os.path.exists(os.path.dirname(filepath)):
         try:
@@ -366,28 +425,73 @@ def write_file_to_folder(filepath, content):
             if exc.errno != errno.EEXIST:
                 raise
 
-    with open(filepath, "+w") as file:
+    with open(filepath, "wb") as file:
         file.write(content)
 
-def save_talk_page(page):
+# All pages of a run go into a single SQLite database in WAL mode: still one
+# file instead of tens of thousands, but unlike the tar stream the inserts
+# are idempotent (a crashed save phase can just be rerun) and downstream
+# loads can query single pages instead of scanning an archive.
+
+def open_page_store(path="./pages.db"):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS pages (kind TEXT, title TEXT, body BLOB, PRIMARY KEY (kind, title))")
+    return conn
+
+def save_page_to_store(conn, kind, title, content):
+    conn.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?)", (kind, title, content.encode('utf-8')))
+
+def load_pages_from_store(kind, path="./pages.db"):
+    """Return a list of (title, text) tuples for every stored page of the
+    given kind ("talk" or "article_plaintext")."""
+    conn = sqlite3.connect(path)
+    try:
+        rows = conn.execute("SELECT title, body FROM pages WHERE kind = ?", (kind,)).fetchall()
+    finally:
+        conn.close()
+
+    return [(title, body.decode('utf-8')) for title, body in rows]
+
+def save_talk_page(page, conn):
     if "revisions" in page:
         content = page["revisions"][0]["slots"]["main"]["*"]  # * from rvslots
         title = page["title"]
 
-        filepath = "./page_contents/" + title +".txt"
-        write_file_to_folder(filepath, content)
+        save_page_to_store(conn, "talk", title, content)
 
-def save_article_plaintext(page):
+def save_article_plaintext(page, conn):
     title = page["title"]
     content = page["extract"]
 
-    filepath = "./article_pages_plaintext/" + title +".txt"
-
-    write_file_to_folder(filepath, content)
+    save_page_to_store(conn, "article_plaintext", title, content)
+
+# Whole-store writers, run via asyncio.to_thread from scrape_wiki so the
+# blocking file I/O happens off the event loop thread. Each phase runs as
+# one transaction, so the fsync cost is paid once instead of per page.
+
+def _write_talk_page_store(talk_pages):
+    conn = open_page_store()
+    with conn:
+        for sublist in tqdm(talk_pages, desc="Writing talk page batches to disk", mininterval=0.5):
+            if not isinstance(sublist, dict): # permanently failed fetches return []
+                continue
+            [save_talk_page(page_content, conn) for _, page_content in sublist.items()]
+    conn.close()
+
+def _write_plaintext_store(wiki_plaintext_pages):
+    conn = open_page_store()
+    with conn:
+        for sublist in tqdm(wiki_plaintext_pages, desc="Parsing and saving plaintext wiki page batches", mininterval=0.5):
+            if not isinstance(sublist, dict): # permanently failed fetches return []
+                continue
+            [save_article_plaintext(page_content, conn) for _,page_content in sublist.items()]
+    conn.close()
 
 # Scraper
 
-async def scrape_wiki(category_titles, verbose=True):
+async def scrape_wiki(category_titles, verbose=True, use_cache=False):
     # Constants
     wiki_api_page_request_limit = 50
     namespace_id_talk = 1
@@ -396,7 +500,7 @@ async def scrape_wiki(category_titles, verbose=True):
     # Get pages in category
     category_queries = [get_category_pages_query(category_title, namespace_id_talk) for category_title in category_titles]
     # Send requests
-    pages = await handle_queries(category_queries, response_handler=handle_category_pages_return, tqdm_desc="Fetching " + str(len(category_titles)) + " categories")
+    pages = await handle_queries(category_queries, response_handler=handle_category_pages_return, tqdm_desc="Fetching " + str(len(category_titles)) + " categories", use_cache=use_cache)
     # Handle results
     talk_titles = [r["title"] for page in pages for r in page]
     
@@ -404,41 +508,40 @@ async def scrape_wiki(category_titles, verbose=True):
     # Find archive pages
     archive_queries = [get_wiki_pages_with_prefix_query(title.replace("Talk:", "") + "/Archive", namespace_id_talk) for title in talk_titles]
     # Send requests
-    archive_titles = await handle_queries(archive_queries, response_handler=handle_wiki_pages_with_prefix_return, tqdm_desc="Fetching " + str(len(talk_titles)) + " page archive titles")
+    archive_titles = await handle_queries(archive_queries, response_handler=handle_wiki_pages_with_prefix_return, tqdm_desc="Fetching " + str(len(talk_titles)) + " page archive titles", use_cache=use_cache)
     archive_titles = flatten(archive_titles)
 
     ## Fetch and parse Talk:
-    # List of all pages to gather
-    all_titles = talk_titles + archive_titles
+    # List of all pages to gather; categories can cross-list the same page,
+    # and every duplicate title costs a full API round-trip
+    all_titles = sorted(set(talk_titles).union(archive_titles))
     # Split list because of API limits
     split_talk_titles_list = list(chunks(all_titles, wiki_api_page_request_limit))
     # Get wiki Talk: pages
     talk_page_queries = [get_wiki_data_query(titles) for titles in split_talk_titles_list]
     # Send requests
-    talk_pages = await handle_queries(talk_page_queries, response_handler=handle_wiki_data_return, tqdm_desc="Fetching " + str(len(all_titles)) + " talk pages")
-    # Parse Talk: pages
-    talk_data = []
-    for sublist in tqdm(talk_pages, desc="Parsing talk page batches", mininterval=0.5):
-        parse_results = [parse_talk_page(page_content) for key, page_content in sublist.items() if type(sublist) == dict]
-        talk_data += parse_results
+    talk_pages = await handle_queries(talk_page_queries, response_handler=handle_wiki_data_return, tqdm_desc="Fetching " + str(len(all_titles)) + " talk pages", use_cache=use_cache)
+    # Parse Talk: pages on all cores
+    loop = asyncio.get_event_loop()
+    parse_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+    talk_batches = await tqdm.gather(*(loop.run_in_executor(parse_pool, _parse_talk_batch, sublist) for sublist in talk_pages), desc="Parsing talk page batches")
+    talk_data = flatten(talk_batches)
 
     # Save talk page Data
-    for sublist in tqdm(talk_pages, desc="Writing talk page batches to disk", mininterval=0.5):
-        [save_talk_page(page_content) for _, page_content in sublist.items()]
+    await asyncio.to_thread(_write_talk_page_store, talk_pages)
 
     ## Article pages
-    article_page_titles = [title.replace("Talk:", "") for title in talk_titles]
+    article_page_titles = sorted({title.replace("Talk:", "") for title in talk_titles})
     # Split list because of API limits
     split_article_titles_list = list(chunks(article_page_titles, wiki_api_page_request_limit))
     # Get wiki Talk: pages
     article_page_queries = [get_wiki_data_query(titles) for titles in split_article_titles_list]
     # Send requests
-    article_pages = await handle_queries(article_page_queries, response_handler=handle_wiki_data_return, tqdm_desc="Fetching " + str(len(article_page_titles)) + " article pages")
-    # Parse wiki pages
-    article_data = []
-    for sublist in tqdm(article_pages, desc="Parsing article page batches", mininterval=0.5):
-        parse_results = [parse_article_page(page_content) for key, page_content in sublist.items() if type(sublist) == dict]
-        article_data += parse_results
+    article_pages = await handle_queries(article_page_queries, response_handler=handle_wiki_data_return, tqdm_desc="Fetching " + str(len(article_page_titles)) + " article pages", use_cache=use_cache)
+    # Parse wiki pages on all cores
+    article_batches = await tqdm.gather(*(loop.run_in_executor(parse_pool, _parse_article_batch, sublist) for sublist in article_pages), desc="Parsing article page batches")
+    article_data = flatten(article_batches)
+    parse_pool.shutdown()
 
     #### Retrieve and store plaintext wiki pages
     # Retrieve plaintext wiki pages for sentiment analysis
@@ -446,23 +549,27 @@ async def scrape_wiki(category_titles, verbose=True):
     # Send requests
     wiki_plaintext_pages = await handle_queries(wiki_plaintext_queries, 
                                       response_handler=handle_wiki_data_return, 
-                                      tqdm_desc="Fetching " + str(len(article_page_titles)) + " plaintext wiki pages")
+                                      tqdm_desc="Fetching " + str(len(article_page_titles)) + " plaintext wiki pages",
+                                      use_cache=use_cache)
     
     # Parse and save plaintext wiki pages
-    for sublist in tqdm(wiki_plaintext_pages, desc="Parsing and saving plaintext wiki page batches", mininterval=0.5):
-        [save_article_plaintext(page_content) for _,page_content in sublist.items()]
+    await asyncio.to_thread(_write_plaintext_store, wiki_plaintext_pages)
 
     ## Revisions
     # Get revisions
     revision_queries = [get_wiki_page_revisions_query(title) for title in article_page_titles]
     # Send requests
-    revisions = await handle_queries(revision_queries, response_handler=handle_wiki_page_revisions_return, tqdm_desc="Fetching " + str(len(article_page_titles)) + " revisions")
+    revisions = await handle_queries(revision_queries, response_handler=handle_wiki_page_revisions_return, tqdm_desc="Fetching " + str(len(article_page_titles)) + " revisions", use_cache=use_cache)
     # Merge list of dicts into one dict
     revision_dict = dict(ChainMap(*revisions))
-    # Extract users
-    user_list = [revision["user"] for page_title, page_revisions in revision_dict.items() for revision in page_revisions if "user" in revision]
-    user_list.extend([link for page_data in talk_data for link in page_data["user_links"]])
-    users_unique = np.unique(user_list)
+    # Extract users: accumulate straight into a set, no intermediate lists
+    # and no object-dtype NumPy sort
+    users_unique = set()
+    for page_revisions in revision_dict.values():
+        users_unique.update(revision["user"] for revision in page_revisions if "user" in revision)
+    for page_data in talk_data:
+        if page_data is not None:
+            users_unique.update(page_data["user_links"])
 
     ## Users  # unused because overkill
     user_edit_counts = []
@@ -478,32 +585,38 @@ async def scrape_wiki(category_titles, verbose=True):
     print("Creating graph")
     page_graph = nx.DiGraph()
 
-    for wiki_page_title in article_page_titles:
-        page_graph.add_node(wiki_page_title, page_class="article")
+    page_graph.add_nodes_from((wiki_page_title, {"page_class": "article"}) for wiki_page_title in article_page_titles)
 
-
-    count = 0
+    # Collect nodes and edges in plain Python containers first, then add them
+    # in bulk; per-call add_node/add_edge sets up attribute dicts every time.
+    user_nodes = set()
+    user_edges = []
     # Add User: links to graph
     for page_data in tqdm(talk_data, desc="Linking users"):
         if page_data is not None:
-            if page_data["origin_title"].replace("Talk:", "") in page_graph:
+            origin_title = page_data["origin_title"].replace("Talk:", "")
+            if origin_title in page_graph:
                 for link in page_data["user_links"]:
                     if link not in page_graph:
-                        page_graph.add_node(link, page_class="user")
-                    page_graph.add_edge(link, page_data["origin_title"].replace("Talk:", ""))
-                    count += 1
+                        user_nodes.add(link)
+                    user_edges.append((link, origin_title))
             #else:
             #    print(origin_title) # Talk:HIV for some reason
 
-    # Add User: links to graph
+    page_graph.add_nodes_from((user, {"page_class": "user"}) for user in user_nodes)
+    page_graph.add_edges_from(user_edges)
+
+    # Add article links to graph
+    article_edges = []
     for page_data in tqdm(article_data, desc="Linking articles"):
         if page_data is not None:
-            if page_data["origin_title"] in page_graph:
-                for link in page_data["article_links"]:
-                    if link in page_graph:
-                        page_graph.add_edge(link, page_data["origin_title"])
-                        count += 1
+            origin_title = page_data["origin_title"] # hoisted out of the per-link generator
+            if origin_title in page_graph:
+                article_edges.extend((link, origin_title) for link in page_data["article_links"] if link in page_graph)
+
+    page_graph.add_edges_from(article_edges)
 
+    count = len(user_edges) + len(article_edges)
     print("Total edges: " + str(count))
 
     infos = {"titles": talk_titles, "archive_titles": archive_titles, "user_edit_counts": user_edit_counts, "revision_dict": revision_dict}
@@ -541,7 +654,7 @@ def parse_category_page(page_content):
     return {}
 
 
-async def get_wikipedia_article_categories(category_titles):
+async def get_wikipedia_article_categories(category_titles, use_cache=False):
     # Constants
     wiki_api_page_request_limit = 10
     namespace_id_talk = 1
@@ -550,18 +663,20 @@ async def get_wikipedia_article_categories(category_titles):
     # Get pages in category
     category_queries = [get_category_pages_query(category_title, namespace_id_talk) for category_title in category_titles]
     # Send requests
-    pages = await handle_queries(category_queries, response_handler=handle_category_pages_return, tqdm_desc="Fetching " + str(len(category_titles)) + " categories")
+    pages = await handle_queries(category_queries, response_handler=handle_category_pages_return, tqdm_desc="Fetching " + str(len(category_titles)) + " categories", use_cache=use_cache)
     # Handle results
     talk_titles = [r["title"] for page in pages for r in page]
-    article_page_titles = [title.replace("Talk:", "") for title in talk_titles]
+    article_page_titles = sorted({title.replace("Talk:", "") for title in talk_titles})
     split_article_titles_list = list(chunks(article_page_titles, wiki_api_page_request_limit))
     article_category_queries = [get_article_category_query(titles) for titles in split_article_titles_list]
 
-    article_page_categories = await handle_queries(article_category_queries, response_handler=handle_wiki_data_return, tqdm_desc="Fetching " + str(len(article_page_titles)) + " article pages")
+    article_page_categories = await handle_queries(article_category_queries, response_handler=handle_wiki_data_return, tqdm_desc="Fetching " + str(len(article_page_titles)) + " article pages", use_cache=use_cache)
 
     page_title_categories = {}
     for sublist in tqdm(article_page_categories, desc="Parsing talk page batches", mininterval=0.5):
-        parse_results = [parse_category_page(page_content) for key, page_content in sublist.items() if type(sublist) == dict]
+        if not isinstance(sublist, dict): # invariant per batch, check once instead of per page
+            continue
+        parse_results = [parse_category_page(page_content) for key, page_content in sublist.items()]
         if len(parse_results) > 0:
             [page_title_categories.update(result) for result in parse_results]
 
@@ -6,26 +6,31 @@ from nltk.tokenize import word_tokenize
 import wikichatter as wc
 import re
 import string
+from concurrent.futures import ProcessPoolExecutor
 wnl = nltk.WordNetLemmatizer()
 
 def flatten(l):
     return [item for sublist in l for item in sublist]
 
-def parse_comments_from_pages(list_file_names):
-    """Iterate over list_file_names and extract all the commens from 
-    each page using wc. Returns a list of parsed pages."""
-    parsed_comments = []
-    # extract comments from talk page files
-    for filename in list_file_names:
-        #print(filename)
-        with open(filename, 'r') as file:
-            text = file.read()
-            try:
-                parsed = wc.parse(text)
-                parsed_comments.append((str(filename), parsed))
-            except:
-                print("failed to parse: " + str(filename))
-    return parsed_comments
+def _parse_comment_page(page):
+    """wc.parse a single (title, text) page tuple. Module-level so it can be
+    pickled into the worker processes."""
+    title, text = page
+    try:
+        return (title, wc.parse(text))
+    except:
+        print("failed to parse: " + str(title))
+        return None
+
+def parse_comments_from_pages(page_store_path="./pages.db"):
+    """Extract all the commens from each talk page in the scraper's page
+    store using wc. Returns a list of parsed pages.
+    wc.parse is CPU-heavy, so the pages are parsed on all cores."""
+    from scraper import load_pages_from_store # local import: scraper pulls in the whole fetch stack
+    # extract comments from talk pages
+    with ProcessPoolExecutor() as executor:
+        results = executor.map(_parse_comment_page, load_pages_from_store("talk", page_store_path), chunksize=32)
+        return [result for result in results if result is not None]
 
 def chunk_list(list, chunk_size: int):
     """Split a list into a list of chunk_sized lists"""
@@ -42,30 +47,51 @@ def parse_comment(comment):
     Parse a single comment and return a tuple in this format: (author, comment words)
     """
     author = comment.get("author")
-    result = ''
-    # result = []
-    for text in comment["text_blocks"]:
-        # result += tokenize_custom(text)
-        result += ' ' +text
-    
+    text_blocks = comment["text_blocks"]
+    # one join allocation instead of growing the string block by block;
+    # the leading space matches the old concatenation
+    result = ' ' + ' '.join(text_blocks) if text_blocks else ''
+
     return (author, result)
 
 def parse_comment_subcomment(comment):
-        """Parse a single comment, and then recursively parse all answers to that comment.
-        Yields a generator with tuples in this format: (author, comment words)"""
-        yield parse_comment(comment)
-        if comment.get("comments"):
-            for subcomment in comment.get("comments"):
-                yield from parse_comment_subcomment(subcomment)
+        """Parse a single comment, and then parse all answers to that comment.
+        Yields a generator with tuples in this format: (author, comment words)
+
+        Iterative depth-first traversal: deeply nested archive threads used
+        to allocate one generator frame per nesting level via 'yield from';
+        an explicit stack keeps the same visit order with a single frame."""
+        stack = [comment]
+        while stack:
+            current = stack.pop()
+            yield parse_comment(current)
+            subcomments = current.get("comments")
+            if subcomments:
+                stack.extend(reversed(subcomments))
+
+_lemma_cache = {}
+def _lemmatize_cached(word):
+    """Memoized wnl.lemmatize: talk pages repeat a core vocabulary of a few
+    thousand words, so almost every WordNet lookup is a repeat."""
+    result = _lemma_cache.get(word)
+    if result is None:
+        result = wnl.lemmatize(word)
+        _lemma_cache[word] = result
+    return result
 
 re_tok = re.compile(f'([{string.punctuation}“”¨«»®´·º½¾¿¡§£₤‘’])')
+# Compiled once at import; tokenize_custom runs per comment and re-compiling
+# (or re-looking-up) the pattern per call is wasted work.
+# Negated character classes instead of non-greedy .*? keep matching linear
+# on long archive pages (no backtracking blowup), and the template branch
+# previously looked for '{}' instead of '}}' so it never matched.
+wikilink_regex = re.compile(r'\[\[[^][]*\]\]|\(\)|\{\{[^{}]*\}\}|<[^<>]*>|[0-9]{1,2} [A-Z][a-z]+ [0-9]{4}|\(UTC\)')
 def tokenize_custom(s):
     if(not s.startswith('=')):
-        wikilink_regex = r'\[\[.*?\]\]|\(\)|\{\{.*?\{\}|<.*?>|[0-9]{1,2} [A-Z][a-z]+ [0-9]{4}|\(UTC\)'
-        s = re.sub(wikilink_regex, ' ', s)
+        s = wikilink_regex.sub(' ', s)
 
         s = word_tokenize(s)
-        s = ' '.join([wnl.lemmatize(word.lower()) for word in s if word.isalnum()])
+        s = ' '.join([_lemmatize_cached(word.lower()) for word in s if word.isalnum()])
         return re_tok.sub(r' \1 ', s).split() # having this line at the end vastly improves classifier results. Not sure why. 
                                             # Just by having this line with the above tokenizer improve score
                                             # from 0.9 to 0.97.